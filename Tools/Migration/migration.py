@@ -5,14 +5,17 @@ Extracts text from a Microsoft Word file and converts it to a structured JSON fo
 
 import sys
 import json
-import random
+import traceback
+import base64
 import os
 import re
-import subprocess
 import hashlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
+from lxml import etree
 from docx import Document
-from docx.text.paragraph import Paragraph
+from docx.enum.style import WD_STYLE_TYPE
 
 # Optional import for SmartArt/Drawing Canvas detection
 try:
@@ -21,12 +24,170 @@ try:
 except ImportError:
     WIN32COM_AVAILABLE = False
 
+# Optional fast JSON serializer; the stdlib is used when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional fast non-cryptographic hash for image fingerprints
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+# XML namespaces (Clark notation) used throughout the document scans.
+# Built once here so hot loops don't rebuild the qualified tag strings.
+M_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/math}'
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+A_NS = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+
+M_OMATH = f'{M_NS}oMath'
+M_OMATHPARA = f'{M_NS}oMathPara'
+M_R = f'{M_NS}r'
+M_T = f'{M_NS}t'
+M_E = f'{M_NS}e'
+M_NUM = f'{M_NS}num'
+M_DEN = f'{M_NS}den'
+M_SUB = f'{M_NS}sub'
+M_SUP = f'{M_NS}sup'
+M_DEG = f'{M_NS}deg'
+M_FNAME = f'{M_NS}fName'
+M_EQARR = f'{M_NS}eqArr'
+M_NARYPR = f'{M_NS}naryPr'
+M_CHR = f'{M_NS}chr'
+M_DPR = f'{M_NS}dPr'
+M_BEGCHR = f'{M_NS}begChr'
+M_ENDCHR = f'{M_NS}endChr'
+M_VAL = f'{M_NS}val'
+
+W_P = f'{W_NS}p'
+W_PPR = f'{W_NS}pPr'
+W_PSTYLE = f'{W_NS}pStyle'
+W_R = f'{W_NS}r'
+W_T = f'{W_NS}t'
+W_RPR = f'{W_NS}rPr'
+W_B = f'{W_NS}b'
+W_VAL = f'{W_NS}val'
+
+# Set to True to trace equation extraction on stdout. Kept off in normal
+# runs so the hot loop never formats the messages.
+_DEBUG = False
+
+# Descendant search paths used inside the run loops
+M_OMATH_DESC = f'.//{M_OMATH}'
+W_T_DESC = f'.//{W_T}'
+
+# Embedded-image scan: one compiled query that yields the r:embed
+# relationship ids of every pictured blip in a subtree
+_XP_EMBED_IDS = etree.XPath(
+    './/w:drawing//a:blip/@r:embed',
+    namespaces={'w': W_NS[1:-1], 'a': A_NS[1:-1],
+                'r': ('http://schemas.openxmlformats.org/officeDocument/'
+                      '2006/relationships')})
+
+# Compiled boolean probe for "does this paragraph contain math at all"
+_XP_HAS_MATH = etree.XPath('boolean(.//m:oMath)', namespaces={'m': M_NS[1:-1]})
+
+# Compiled XPath for the equation scan: display blocks plus any inline
+# oMath not already covered by a block. Compiling once avoids re-parsing
+# the expression for every run.
+_XP_RUN_MATH = etree.XPath(
+    './/m:oMathPara | .//m:oMath[not(ancestor::m:oMathPara)]',
+    namespaces={'m': M_NS[1:-1]})
+
+
+# Precompiled patterns (compiling once at import avoids re-running the regex
+# compiler/cache lookup for every paragraph)
+_NUMBERING_RE = re.compile(r'^([0-9]+|[A-Za-z])\.?\s+')
+
+# Single-character limits that make a Word "summation" look like an integral
+# (see the n-ary heuristic in omml_to_latex)
+_SIMPLE_LIMITS = frozenset('abcdefghijklmnopqrstuvwxyz'
+                           'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789')
+
+# MIME content type -> exported image extension (anything unknown falls
+# back to png, matching the old substring chain)
+_CONTENT_TYPE_EXT = {
+    'image/jpeg': 'jpg',
+    'image/jpg': 'jpg',
+    'image/png': 'png',
+    'image/gif': 'gif',
+}
+
+# Sort keys for the chapter rows written by this tool: concept.json keeps
+# chapterNo as an integer, qa.json as a string
+_CHAPTER_NO_KEY = itemgetter('chapterNo')
+
+
+def _qa_chapter_no_key(chapter):
+    return int(chapter.get('chapterNo', '0'))
+
+# Paragraph style -> content type emitted by the exporters. Styles listed
+# in _NUMBERED_STYLES additionally carry the list label pulled from their
+# leading text.
+_STYLE_TO_WRAPPER = {
+    "# Body": "body",
+    "# Bullet-1": "bullet1",
+    "# Bullet-2": "bullet2",
+    "# Sub Topic - 3": "sub-topic-3",
+    "# Numbering-1": "number1",
+    "# Numbering-2": "number2",
+    "# Highlight Red": "highlight-red",
+    "# Highlight Brown": "highlight-brown",
+    "# Highlight Blue": "highlight-blue",
+    "# Highlight Green": "highlight-green",
+}
+_NUMBERED_STYLES = frozenset(("# Numbering-1", "# Numbering-2"))
+
+# Styles outside the table whose text is still exported (alongside any
+# equations) by the fallback branch
+_TEXT_ENABLED_STYLES = frozenset(("# Highlight", "# Headline", "# Body Equation"))
+
+# Common n-ary operators mapped to LaTeX (shared by every nary conversion)
+_NARY_OP_MAP = {
+    '∑': '\\sum',
+    '∏': '\\prod',
+    '∫': '\\int',
+    '⋃': '\\bigcup',
+    '⋂': '\\bigcap',
+    '⨁': '\\bigoplus',
+    '⨂': '\\bigotimes'
+}
+_TYPE_TAG_RE = re.compile(r'<type=(\d+)>')
+_EXERCISE_TAG_RE = re.compile(r'<exercise="([^"]+)">')
+_ACTIVITY_QUIZ_RE = re.compile(r'<activity_quiz="[^"]+",\s*answer="?(\d+)"?>')
+_SANITIZE_RE = re.compile(r'[^a-zA-Z0-9\-_]')
+
+# Translation table for sanitize_filename: spaces become hyphens, every
+# other ASCII character outside [a-zA-Z0-9-_] is dropped. translate leaves
+# unmapped (non-ASCII) ordinals alone, so those still go through the regex.
+_SANITIZE_TABLE = {i: None for i in range(128)}
+_SANITIZE_TABLE.update(
+    (ord(c), c) for c in 'abcdefghijklmnopqrstuvwxyz'
+                         'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_')
+_SANITIZE_TABLE[ord(' ')] = '-'
+
+
+
+# Entropy pool for generate_id: refilled in bulk so the os.urandom
+# syscall is paid once per 512 ids instead of on every call
+_id_pool = b''
+_id_pool_pos = 0
 
 
 def generate_id():
     """Generate an 8-character random alphanumeric string."""
-    chars = 'abcdefghijklmnopqrstuvwxyz0123456789'
-    return ''.join(random.choice(chars) for _ in range(8))
+    global _id_pool, _id_pool_pos
+    if _id_pool_pos >= len(_id_pool):
+        _id_pool = os.urandom(5 * 512)
+        _id_pool_pos = 0
+    # 5 random bytes encode to exactly 8 base32 chars; lowercased they stay
+    # within the original a-z0-9 alphabet
+    raw = _id_pool[_id_pool_pos:_id_pool_pos + 5]
+    _id_pool_pos += 5
+    return base64.b32encode(raw).decode('ascii').lower()
 
 
 def create_paragraph_wrapper(content_list, content_type_name, numbering=None):
@@ -44,14 +205,20 @@ def create_paragraph_wrapper(content_list, content_type_name, numbering=None):
     if not content_list:
         return None
     
-    # Check if we have mixed content (both text and equations)
-    has_text = any(ct == 'text' for ct, _ in content_list)
-    has_equation = any(ct == 'equation' for ct, _ in content_list)
+    # Classify the content in one pass
+    has_text = False
+    has_equation = False
+    for ct, _ in content_list:
+        if ct == 'text':
+            has_text = True
+        else:
+            has_equation = True
+        if has_text and has_equation:
+            break
     
     # If only one type, return as single item
-    if not (has_text and has_equation):
-        # Single text item
-        if len(content_list) == 1 and content_list[0][0] == 'text':
+    if len(content_list) == 1 and not (has_text and has_equation):
+        if has_text:
             item = {
                 "id": generate_id(),
                 "type": content_type_name,
@@ -60,8 +227,7 @@ def create_paragraph_wrapper(content_list, content_type_name, numbering=None):
             if numbering and content_type_name in ['number1', 'number2']:
                 item["number"] = numbering
             return item
-        # Single equation item
-        elif len(content_list) == 1 and content_list[0][0] == 'equation':
+        else:
             return {
                 "id": generate_id(),
                 "type": "equation",
@@ -95,21 +261,25 @@ def create_paragraph_wrapper(content_list, content_type_name, numbering=None):
 
 
 
-def extract_numbering_text(paragraph):
+def _element_text(p_elem):
+    """Concatenate the visible text of a paragraph element (all w:t runs)."""
+    return ''.join(t.text or '' for t in p_elem.iter(W_T))
+
+
+def extract_numbering_text(p_elem):
     """
-    Extract the numbering text from a numbered paragraph.
+    Extract the numbering text from a numbered paragraph element.
     Returns the numbering label (e.g., "1", "2", "A", "B") or None.
     """
     try:
         # Get the paragraph text
-        full_text = paragraph.text.strip()
+        full_text = _element_text(p_elem).strip()
         if not full_text:
             return None
         
         # Try to extract numbering pattern at the start
         # Patterns: "1.", "2.", "A.", "B.", "a.", "b.", etc.
-        import re
-        match = re.match(r'^([0-9]+|[A-Za-z])\.?\s+', full_text)
+        match = _NUMBERING_RE.match(full_text)
         if match:
             return match.group(1)
         
@@ -124,44 +294,28 @@ def sanitize_filename(label):
     - Replace spaces with hyphens
     - Remove special characters like ., ?, !, etc.
     """
+    if label.isascii():
+        # Single C-level pass: hyphenate spaces and drop everything else
+        # outside the allowed set
+        return label.translate(_SANITIZE_TABLE)
     # Replace spaces with hyphens
     filename = label.replace(' ', '-')
     # Remove special characters (keep only alphanumeric, hyphens, and underscores)
-    filename = re.sub(r'[^a-zA-Z0-9\-_]', '', filename)
+    filename = _SANITIZE_RE.sub('', filename)
     return filename
 
 
-def is_bold(run):
-    """Check if a run has bold formatting."""
-    return run.bold is True
-
-
-def extract_text_with_formatting(paragraph):
-    """Extract text from paragraph, preserving bold formatting with markdown."""
-    text_parts = []
-    for run in paragraph.runs:
-        text = run.text
-        if text:
-            if is_bold(run):
-                text_parts.append(f"**{text}**")
-            else:
-                text_parts.append(text)
-    return ''.join(text_parts)
-
-
-def extract_paragraph_content_in_order(paragraph):
+def extract_paragraph_content_in_order(p_elem):
     """
-    Extract paragraph content (text and equations) in document order.
+    Extract content (text and equations) of a paragraph element in
+    document order.
     
     Returns:
         List of tuples: (content_type, content_value)
         where content_type is 'text' or 'equation'
     """
-    m_ns = '{http://schemas.openxmlformats.org/officeDocument/2006/math}'
-    w_ns = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
-    
     content_items = []
-    para_xml = paragraph._element
+    para_xml = p_elem
     
     # Track current text buffer
     text_buffer = []
@@ -171,9 +325,13 @@ def extract_paragraph_content_in_order(paragraph):
         tag = child.tag
         
         # Check if this is a run (text content)
-        if tag == f'{w_ns}r':
-            # Check if this run contains an equation
-            omath = child.find(f'.//{m_ns}oMath')
+        if tag == W_R:
+            # Check if this run contains an equation. Runs made up purely of
+            # properties and text can't hold math, so only pay for the
+            # descendant search when some other child element is present.
+            omath = None
+            if any(gc.tag not in (W_RPR, W_T) for gc in child):
+                omath = child.find(M_OMATH_DESC)
             if omath is not None:
                 # Flush text buffer before adding equation
                 if text_buffer:
@@ -189,16 +347,17 @@ def extract_paragraph_content_in_order(paragraph):
             else:
                 # Regular text run - extract text with formatting
                 run_text = ''
-                t_elem = child.find(f'.//{w_ns}t')
+                t_elem = child.find(W_T_DESC)
                 if t_elem is not None and t_elem.text:
-                    # Check if bold
-                    rPr = child.find(f'{w_ns}rPr')
+                    # Check if bold. The schema pins rPr as the first child
+                    # of a run, so an index check beats a subtree search.
+                    rPr = child[0] if len(child) and child[0].tag == W_RPR else None
                     is_bold_run = False
                     if rPr is not None:
-                        b_elem = rPr.find(f'{w_ns}b')
+                        b_elem = rPr.find(W_B)
                         if b_elem is not None:
                             # Check if bold is explicitly turned off
-                            val = b_elem.get(f'{w_ns}val', 'true')
+                            val = b_elem.get(W_VAL, 'true')
                             is_bold_run = val.lower() != 'false'
                     
                     if is_bold_run:
@@ -209,7 +368,7 @@ def extract_paragraph_content_in_order(paragraph):
                     text_buffer.append(run_text)
         
         # Check if this is an inline oMath (direct child of paragraph)
-        elif tag == f'{m_ns}oMath':
+        elif tag == M_OMATH:
             # Flush text buffer before adding equation
             if text_buffer:
                 text_content = ''.join(text_buffer).strip()
@@ -223,7 +382,7 @@ def extract_paragraph_content_in_order(paragraph):
                 content_items.append(('equation', latex))
         
         # Check if this is an oMathPara (display equation)
-        elif tag == f'{m_ns}oMathPara':
+        elif tag == M_OMATHPARA:
             # Flush text buffer before adding equation
             if text_buffer:
                 text_content = ''.join(text_buffer).strip()
@@ -232,7 +391,7 @@ def extract_paragraph_content_in_order(paragraph):
                 text_buffer = []
             
             # Extract display equation
-            omaths = child.findall(f'{m_ns}oMath')
+            omaths = child.findall(M_OMATH)
             if omaths:
                 latex_lines = []
                 for omath in omaths:
@@ -243,23 +402,7 @@ def extract_paragraph_content_in_order(paragraph):
                 if latex_lines:
                     # If multiple equations, combine them with aligned environment
                     if len(latex_lines) > 1:
-                        aligned_lines = []
-                        for i, line in enumerate(latex_lines):
-                            if i == 0:
-                                # First line: add & before the first = sign
-                                if '=' in line:
-                                    line = line.replace('=', '&=', 1)
-                                aligned_lines.append(line)
-                            else:
-                                # Subsequent lines: add & at the start if line starts with =
-                                if line.strip().startswith('='):
-                                    aligned_lines.append('&' + line.strip())
-                                else:
-                                    # If line doesn't start with =, add & before first =
-                                    if '=' in line:
-                                        line = line.replace('=', '&=', 1)
-                                    aligned_lines.append(line)
-                        
+                        aligned_lines = [_align_line(line) for line in latex_lines]
                         combined_latex = '\\begin{aligned}\n' + ' \\\\\n'.join(aligned_lines) + '\n\\end{aligned}'
                         content_items.append(('equation', combined_latex))
                     else:
@@ -275,11 +418,297 @@ def extract_paragraph_content_in_order(paragraph):
 
 
 
-def get_paragraph_style(paragraph):
-    """Get the style name of a paragraph."""
-    if paragraph.style and paragraph.style.name:
-        return paragraph.style.name
-    return None
+def _build_style_map(doc):
+    """
+    Build a styleId -> style name table for a document.
+    
+    Resolving paragraph.style through python-docx walks the styles part for
+    every paragraph; with this table the per-paragraph lookup is a direct
+    read of the pPr/pStyle reference plus one dict probe. The document's
+    default paragraph style is stored under the None key for paragraphs
+    without an explicit pStyle.
+    """
+    # Interning collapses the thousands of repeated style-name strings to
+    # one object each, making the dispatch comparisons pointer checks
+    style_map = {s.style_id: sys.intern(s.name) for s in doc.styles}
+    default = doc.styles.default(WD_STYLE_TYPE.PARAGRAPH)
+    style_map[None] = sys.intern(default.name) if default is not None else None
+    return style_map
+
+
+def _style_name(p_elem, style_map):
+    """Get the style name of a paragraph element via the document's table."""
+    ppr = p_elem[0] if len(p_elem) and p_elem[0].tag == W_PPR else None
+    if ppr is not None:
+        pstyle = ppr.find(W_PSTYLE)
+        if pstyle is not None:
+            return style_map.get(pstyle.get(W_VAL), style_map[None])
+    return style_map[None]
+
+
+def _omml_child_map(elem):
+    """Index direct children by tag in one pass (first occurrence wins, like find)."""
+    kids = {}
+    for child in elem:
+        if child.tag not in kids:
+            kids[child.tag] = child
+    return kids
+
+
+def _omml_f(elem, res):
+    """Fraction."""
+    kids = _omml_child_map(elem)
+    num = kids.get(M_NUM)
+    den = kids.get(M_DEN)
+    num_latex = res(num) if num is not None else ''
+    den_latex = res(den) if den is not None else ''
+    return f'\\frac{{{num_latex}}}{{{den_latex}}}'
+
+
+def _omml_ssup(elem, res):
+    """Superscript."""
+    kids = _omml_child_map(elem)
+    base = kids.get(M_E)
+    sup = kids.get(M_SUP)
+    base_latex = res(base) if base is not None else ''
+    sup_latex = res(sup) if sup is not None else ''
+    return f'{base_latex}^{{{sup_latex}}}'
+
+
+def _omml_ssub(elem, res):
+    """Subscript."""
+    kids = _omml_child_map(elem)
+    base = kids.get(M_E)
+    sub = kids.get(M_SUB)
+    base_latex = res(base) if base is not None else ''
+
+    # Check if subscript contains an equation array (multi-line subscript)
+    eqArr = sub.find(M_EQARR) if sub is not None else None
+    if eqArr is not None:
+        # Multi-line subscript - use substack for vertical stacking
+        rows = []
+        for e_elem in eqArr:
+            if e_elem.tag != M_E:
+                continue
+            row_content = res(e_elem)
+            if row_content:
+                rows.append(row_content)
+
+        if rows:
+            # Use double backslash in Python string to get single backslash in output
+            sub_latex = '\\substack{' + ' \\\\ '.join(rows) + '}'
+        else:
+            sub_latex = res(sub)
+    else:
+        sub_latex = res(sub) if sub is not None else ''
+
+    return f'{base_latex}_{{{sub_latex}}}'
+
+
+def _omml_ssubsup(elem, res):
+    """Subscript-Superscript."""
+    kids = _omml_child_map(elem)
+    base = kids.get(M_E)
+    sub = kids.get(M_SUB)
+    sup = kids.get(M_SUP)
+    base_latex = res(base) if base is not None else ''
+    sub_latex = res(sub) if sub is not None else ''
+    sup_latex = res(sup) if sup is not None else ''
+    return f'{base_latex}_{{{sub_latex}}}^{{{sup_latex}}}'
+
+
+def _omml_rad(elem, res):
+    """Radical (square root)."""
+    kids = _omml_child_map(elem)
+    deg = kids.get(M_DEG)
+    base = kids.get(M_E)
+    base_latex = res(base) if base is not None else ''
+    if deg is not None and deg.text and not deg.text.isspace():
+        deg_latex = res(deg)
+        return f'\\sqrt[{deg_latex}]{{{base_latex}}}'
+    return f'\\sqrt{{{base_latex}}}'
+
+
+def _omml_func(elem, res):
+    """Function (like lim, sin, cos, etc.)."""
+    # Get the function name
+    fName = elem.find(M_FNAME)
+    func_name = res(fName) if fName is not None else ''
+
+    # Get the base expression (what comes after the function)
+    e_elem = elem.find(M_E)
+    base_latex = res(e_elem) if e_elem is not None else ''
+
+    # Add backslash for LaTeX function names (lim, sin, cos, etc.)
+    if func_name and not func_name.startswith('\\'):
+        func_name = '\\' + func_name
+
+    return f'{func_name}{base_latex}'
+
+
+def _align_line(line, anchor_start=False):
+    """
+    Insert the aligned-environment alignment marker (&) into one line.
+    
+    Lines that start with = get the marker in front; otherwise it goes
+    before the first = sign. Lines without any = are anchored at the
+    start only when anchor_start is set (equation-array rows).
+    """
+    stripped = line.strip()
+    if stripped.startswith('='):
+        return '&' + stripped
+    eq = line.find('=')
+    if eq != -1:
+        return line[:eq] + '&' + line[eq:]
+    return '&' + line if anchor_start else line
+
+
+def _omml_eqarr(elem, res):
+    """Equation Array (aligned equations)."""
+    rows = []
+    for e_elem in elem:
+        if e_elem.tag != M_E:
+            continue
+        row_content = res(e_elem)
+        if row_content:
+            rows.append(_align_line(row_content, anchor_start=True))
+
+    if rows:
+        # Join rows with LaTeX line break
+        aligned_content = ' \\\\\n'.join(rows)
+        return f'\\begin{{aligned}}\n{aligned_content}\n\\end{{aligned}}'
+    return ''
+
+
+def _omml_nary(elem, res):
+    """N-ary operators (summation, product, integral, etc.)."""
+    kids = _omml_child_map(elem)
+
+    # Get the operator character
+    naryPr = kids.get(M_NARYPR)
+    operator = '\\sum'  # Default to summation
+    chr_val = '∑'  # Default character
+
+    if naryPr is not None:
+        chr_elem = naryPr.find(M_CHR)
+        if chr_elem is not None:
+            chr_val = chr_elem.get(M_VAL, '∑')
+            operator = _NARY_OP_MAP.get(chr_val, '\\sum')
+
+    # Get subscript (lower limit)
+    sub_elem = kids.get(M_SUB)
+    sub_latex = res(sub_elem) if sub_elem is not None else ''
+
+    # Get superscript (upper limit)
+    sup_elem = kids.get(M_SUP)
+    sup_latex = res(sup_elem) if sup_elem is not None else ''
+
+    # HEURISTIC: Word sometimes stores integrals as summations
+    # Detect if this is actually an integral by checking the limits
+    if chr_val == '∑' and sub_elem is not None and sup_elem is not None:
+        # Integrals typically have simple single-character limits (a, b, 0, 1, etc.)
+        # Summations typically have expressions like i=1, n, etc.
+        if sub_latex in _SIMPLE_LIMITS and sup_latex in _SIMPLE_LIMITS:
+            operator = '\\int'
+
+    # Get the base expression (what comes after the operator)
+    e_elem = kids.get(M_E)
+    base_latex = res(e_elem) if e_elem is not None else ''
+
+    # Build the LaTeX expression
+    result = operator
+    if sub_latex:
+        result += f'_{{{sub_latex}}}'
+    if sup_latex:
+        result += f'^{{{sup_latex}}}'
+    result += base_latex
+
+    return result
+
+
+def _omml_d(elem, res):
+    """Delimiter (parentheses, brackets, etc.)."""
+    kids = _omml_child_map(elem)
+    e_elem = kids.get(M_E)
+    content = res(e_elem) if e_elem is not None else ''
+    # Try to get delimiter properties
+    dPr = kids.get(M_DPR)
+    if dPr is not None:
+        begChr = dPr.find(M_BEGCHR)
+        endChr = dPr.find(M_ENDCHR)
+        begin = begChr.get(M_VAL, '(') if begChr is not None else '('
+        end = endChr.get(M_VAL, ')') if endChr is not None else ')'
+        return f'{begin}{content}{end}'
+    return f'\\left({content}\\right)'
+
+
+def _omml_r(elem, res):
+    """Text run."""
+    t_elem = elem.find(M_T)
+    if t_elem is not None and t_elem.text:
+        return t_elem.text
+    return ''
+
+
+def _omml_t(elem, res):
+    """Text element."""
+    return elem.text if elem.text else ''
+
+
+def _omml_container(elem, res):
+    """Container elements (oMath, e, num, den, ...) - process children."""
+    return ''.join(res(child) for child in elem)
+
+
+# Dispatch table for OMML tags; anything not listed is treated as a container
+_OMML_HANDLERS = {
+    'f': _omml_f,
+    'sSup': _omml_ssup,
+    'sSub': _omml_ssub,
+    'sSubSup': _omml_ssubsup,
+    'rad': _omml_rad,
+    'func': _omml_func,
+    'eqArr': _omml_eqarr,
+    'nary': _omml_nary,
+    'd': _omml_d,
+    'r': _omml_r,
+    't': _omml_t,
+}
+
+
+def _process_omml(elem):
+    """
+    Convert one OMML element (and its subtree) to LaTeX.
+    
+    The walk is an explicit post-order traversal: children are converted
+    before their parent and the handlers read child results out of a dict,
+    so deeply nested equations never stack Python frames or hit the
+    recursion limit. The dict is keyed by the elements themselves — that
+    keeps their lxml proxies alive, which is what makes the keys stable
+    across re-iteration.
+    """
+    results = {}
+    stack = [(elem, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if children_done:
+            tag = node.tag
+            if tag.startswith(M_NS):
+                tag = tag[len(M_NS):]
+            results[node] = _OMML_HANDLERS.get(tag, _omml_container)(
+                node, results.__getitem__)
+        else:
+            stack.append((node, True))
+            for child in node:
+                stack.append((child, False))
+    
+    return results[elem]
+
+
+# Conversion results keyed by a digest of the serialized OMML subtree.
+# Textbooks repeat the same equation across examples and summaries, and the
+# conversion is pure with respect to the element bytes, so repeats are free.
+_OMML_CACHE = {}
 
 
 def omml_to_latex(omml_element):
@@ -292,217 +721,24 @@ def omml_to_latex(omml_element):
     Returns:
         LaTeX string representation
     """
-    # OMML namespace
-    m_ns = '{http://schemas.openxmlformats.org/officeDocument/2006/math}'
-    
-    def process_element(elem):
-        """Recursively process OMML elements."""
-        tag = elem.tag.replace(m_ns, '')
-        
-        # Fraction
-        if tag == 'f':
-            num = elem.find(f'{m_ns}num')
-            den = elem.find(f'{m_ns}den')
-            num_latex = process_element(num) if num is not None else ''
-            den_latex = process_element(den) if den is not None else ''
-            return f'\\frac{{{num_latex}}}{{{den_latex}}}'
-        
-        # Superscript
-        elif tag == 'sSup':
-            base = elem.find(f'{m_ns}e')
-            sup = elem.find(f'{m_ns}sup')
-            base_latex = process_element(base) if base is not None else ''
-            sup_latex = process_element(sup) if sup is not None else ''
-            return f'{base_latex}^{{{sup_latex}}}'
-        
-        # Subscript
-        elif tag == 'sSub':
-            base = elem.find(f'{m_ns}e')
-            sub = elem.find(f'{m_ns}sub')
-            base_latex = process_element(base) if base is not None else ''
-            
-            # Check if subscript contains an equation array (multi-line subscript)
-            if sub is not None and sub.find(f'{m_ns}eqArr') is not None:
-                # Multi-line subscript - use substack for vertical stacking
-                eqArr = sub.find(f'{m_ns}eqArr')
-                rows = []
-                for e_elem in eqArr.findall(f'{m_ns}e'):
-                    row_content = process_element(e_elem)
-                    if row_content:
-                        rows.append(row_content)
-                
-                if rows:
-                    # Use double backslash in Python string to get single backslash in output
-                    sub_latex = '\\substack{' + ' \\\\ '.join(rows) + '}'
-                else:
-                    sub_latex = process_element(sub) if sub is not None else ''
-            else:
-                sub_latex = process_element(sub) if sub is not None else ''
-            
-            return f'{base_latex}_{{{sub_latex}}}'
-        
-        # Subscript-Superscript
-        elif tag == 'sSubSup':
-            base = elem.find(f'{m_ns}e')
-            sub = elem.find(f'{m_ns}sub')
-            sup = elem.find(f'{m_ns}sup')
-            base_latex = process_element(base) if base is not None else ''
-            sub_latex = process_element(sub) if sub is not None else ''
-            sup_latex = process_element(sup) if sup is not None else ''
-            return f'{base_latex}_{{{sub_latex}}}^{{{sup_latex}}}'
-        
-        # Radical (square root)
-        elif tag == 'rad':
-            deg = elem.find(f'{m_ns}deg')
-            base = elem.find(f'{m_ns}e')
-            base_latex = process_element(base) if base is not None else ''
-            if deg is not None and deg.text and deg.text.strip():
-                deg_latex = process_element(deg)
-                return f'\\sqrt[{deg_latex}]{{{base_latex}}}'
-            return f'\\sqrt{{{base_latex}}}'
-        
-        # Function (like lim, sin, cos, etc.)
-        elif tag == 'func':
-            # Get the function name
-            fName = elem.find(f'{m_ns}fName')
-            func_name = process_element(fName) if fName is not None else ''
-            
-            # Get the base expression (what comes after the function)
-            e_elem = elem.find(f'{m_ns}e')
-            base_latex = process_element(e_elem) if e_elem is not None else ''
-            
-            # Add backslash for LaTeX function names (lim, sin, cos, etc.)
-            if func_name and not func_name.startswith('\\'):
-                func_name = '\\' + func_name
-            
-            return f'{func_name}{base_latex}'
-        
-        # Equation Array (aligned equations)
-        elif tag == 'eqArr':
-            rows = []
-            for e_elem in elem.findall(f'{m_ns}e'):
-                row_content = process_element(e_elem)
-                if row_content:
-                    # Add alignment marker based on content
-                    # Case 1: Row starts with = (common in multi-line equations like |A| = ... = ... = ...)
-                    if row_content.strip().startswith('='):
-                        row_content = '&' + row_content.strip()
-                    # Case 2: Row contains = but doesn't start with it
-                    elif '=' in row_content:
-                        row_content = row_content.replace('=', '&=', 1)
-                    # Case 3: No = sign - align at the start (for cases like limits with conditions)
-                    else:
-                        row_content = '&' + row_content
-                    
-                    rows.append(row_content)
-            
-            if rows:
-                # Join rows with LaTeX line break
-                aligned_content = ' \\\\\n'.join(rows)
-                return f'\\begin{{aligned}}\n{aligned_content}\n\\end{{aligned}}'
-            return ''
-        
-        # N-ary operators (summation, product, integral, etc.)
-        elif tag == 'nary':
-            # Get the operator character
-            naryPr = elem.find(f'{m_ns}naryPr')
-            operator = '\\sum'  # Default to summation
-            chr_val = '∑'  # Default character
-            
-            if naryPr is not None:
-                chr_elem = naryPr.find(f'{m_ns}chr')
-                if chr_elem is not None:
-                    chr_val = chr_elem.get(f'{m_ns}val', '∑')
-                    # Map common n-ary operators to LaTeX
-                    operator_map = {
-                        '∑': '\\sum',
-                        '∏': '\\prod',
-                        '∫': '\\int',
-                        '⋃': '\\bigcup',
-                        '⋂': '\\bigcap',
-                        '⨁': '\\bigoplus',
-                        '⨂': '\\bigotimes'
-                    }
-                    operator = operator_map.get(chr_val, '\\sum')
-            
-            # Get subscript (lower limit)
-            sub_elem = elem.find(f'{m_ns}sub')
-            sub_latex = process_element(sub_elem) if sub_elem is not None else ''
-            
-            # Get superscript (upper limit)
-            sup_elem = elem.find(f'{m_ns}sup')
-            sup_latex = process_element(sup_elem) if sup_elem is not None else ''
-            
-            # HEURISTIC: Word sometimes stores integrals as summations
-            # Detect if this is actually an integral by checking the limits
-            if chr_val == '∑' and sub_elem is not None and sup_elem is not None:
-                # Integrals typically have simple single-character limits (a, b, 0, 1, etc.)
-                # Summations typically have expressions like i=1, n, etc.
-                is_simple_lower = len(sub_latex) == 1 and sub_latex.isalnum()
-                is_simple_upper = len(sup_latex) == 1 and sup_latex.isalnum()
-                
-                if is_simple_lower and is_simple_upper:
-                    operator = '\\int'
-            
-            # Get the base expression (what comes after the operator)
-            e_elem = elem.find(f'{m_ns}e')
-            base_latex = process_element(e_elem) if e_elem is not None else ''
-            
-            # Build the LaTeX expression
-            result = operator
-            if sub_latex:
-                result += f'_{{{sub_latex}}}'
-            if sup_latex:
-                result += f'^{{{sup_latex}}}'
-            result += base_latex
-            
-            return result
-        
-        # Delimiter (parentheses, brackets, etc.)
-        elif tag == 'd':
-            e_elem = elem.find(f'{m_ns}e')
-            content = process_element(e_elem) if e_elem is not None else ''
-            # Try to get delimiter properties
-            dPr = elem.find(f'{m_ns}dPr')
-            if dPr is not None:
-                begChr = dPr.find(f'{m_ns}begChr')
-                endChr = dPr.find(f'{m_ns}endChr')
-                begin = begChr.get(f'{m_ns}val', '(') if begChr is not None else '('
-                end = endChr.get(f'{m_ns}val', ')') if endChr is not None else ')'
-                return f'{begin}{content}{end}'
-            return f'\\left({content}\\right)'
-        
-        # Text run
-        elif tag == 'r':
-            t_elem = elem.find(f'{m_ns}t')
-            if t_elem is not None and t_elem.text:
-                return t_elem.text
-            return ''
-        
-        # Text element
-        elif tag == 't':
-            return elem.text if elem.text else ''
-        
-        # Container elements - process children
-        elif tag in ['oMath', 'oMathPara', 'e', 'num', 'den', 'sup', 'sub', 'deg']:
-            result = ''
-            for child in elem:
-                result += process_element(child)
-            return result
-        
-        # Default: process children
-        else:
-            result = ''
-            for child in elem:
-                result += process_element(child)
-            return result
-    
+    key = hashlib.blake2b(etree.tostring(omml_element), digest_size=16).digest()
+    cached = _OMML_CACHE.get(key)
+    if cached is not None:
+        return cached
+
     try:
-        latex = process_element(omml_element)
-        return latex.strip()
+        latex = _process_omml(omml_element).strip()
     except Exception as e:
         print(f"Warning: Error converting OMML to LaTeX: {e}")
-        return ""
+        latex = ""
+
+    _OMML_CACHE[key] = latex
+    return latex
+
+
+# Cap on full tracebacks from the equation extractor (see handler below)
+_MAX_EQUATION_TRACEBACKS = 3
+_equation_error_count = 0
 
 
 def extract_equations_from_run(run):
@@ -516,46 +752,69 @@ def extract_equations_from_run(run):
         List of tuples (equation_latex, is_display) where is_display indicates if it's a display equation
     """
     equations = []
-    m_ns = '{http://schemas.openxmlformats.org/officeDocument/2006/math}'
-    
+
     try:
-        # Look for math elements in the run's XML
+        # Look for math elements in the run's XML in a single pass
         # oMathPara = display equation (block)
         # oMath = inline equation
-        
-        for math_para in run.element.findall(f'.//{m_ns}oMathPara'):
-            # Display equation
-            omath = math_para.find(f'{m_ns}oMath')
-            if omath is not None:
-                latex = omml_to_latex(omath)
-                if latex:
-                    # print(f"  [DEBUG] Found display equation: {latex[:50]}...")
-                    equations.append((latex, True))  # True = display equation
-        
-        for omath in run.element.findall(f'.//{m_ns}oMath'):
-            # Check if this oMath is not inside an oMathPara (to avoid duplicates)
-            if omath.getparent().tag != f'{m_ns}oMathPara':
-                latex = omml_to_latex(omath)
+
+        for elem in _XP_RUN_MATH(run.element):
+            if elem.tag == M_OMATHPARA:
+                # Display equation
+                omath = elem.find(M_OMATH)
+                if omath is not None:
+                    latex = omml_to_latex(omath)
+                    if latex:
+                        if _DEBUG:
+                            print(f"  [DEBUG] Found display equation: {latex[:50]}...")
+                        equations.append((latex, True))  # True = display equation
+            else:
+                # Inline equation (oMath inside oMathPara is excluded by the XPath)
+                latex = omml_to_latex(elem)
                 if latex:
-                    # print(f"  [DEBUG] Found inline equation: {latex[:50]}...")
+                    if _DEBUG:
+                        print(f"  [DEBUG] Found inline equation: {latex[:50]}...")
                     equations.append((latex, False))  # False = inline equation
     
     except Exception as e:
+        global _equation_error_count
         print(f"Warning: Error extracting equations: {e}")
-        import traceback
-        traceback.print_exc()
+        # Print full tracebacks for the first few failures only; a document
+        # with a systematically broken construct would otherwise flood the
+        # console with one traceback per paragraph
+        if _equation_error_count < _MAX_EQUATION_TRACEBACKS:
+            _equation_error_count += 1
+            traceback.print_exc()
     
     return equations
 
 
 
-def scan_for_smartart_and_canvas(file_path):
+def _dispatch_word():
+    """
+    Start a Word.Application COM instance.
+    
+    Prefers early binding: gencache builds a dispatch table from Word's
+    type library once, so repeated attribute reads (shape.Type, the crop
+    probes) stop re-querying type info over IDispatch on every access.
+    Falls back to late binding when the gen_py cache is unavailable.
+    """
+    try:
+        return win32com.client.gencache.EnsureDispatch("Word.Application")
+    except Exception:
+        return win32com.client.Dispatch("Word.Application")
+
+
+def scan_for_smartart_and_canvas(file_path, word=None):
     """
     Scan a Word document for SmartArt, Drawing Canvas, Tables, and Cropped Images.
     Adds a review comment in the document for each detected object.
     
     Args:
         file_path: Path to the Word document
+        word: Optional already-running Word.Application to reuse. When
+            omitted a private instance is started and quit here; a shared
+            instance is left running for the caller.
     
     Returns:
         List of dictionaries with object type and page number
@@ -565,13 +824,24 @@ def scan_for_smartart_and_canvas(file_path):
         return []
     
     objects_found = []
-    word = None
+    owns_word = word is None
     doc = None
     
+    # msoShapeType values that always flag a review (cropped pictures are
+    # handled separately since they need a PictureFormat probe)
+    shape_type_map = {15: 'SmartArt', 16: 'Drawing Canvas', 20: 'Drawing Canvas'}
+    
+    # COM must be initialized per thread; the call is refcounted, so the
+    # matching CoUninitialize in the finally block keeps things balanced
+    # on the main thread as well
+    import pythoncom
+    pythoncom.CoInitialize()
+    
     try:
-        # Start Word application
-        word = win32com.client.Dispatch("Word.Application")
-        word.Visible = False
+        # Start Word application (unless the caller lent us one)
+        if owns_word:
+            word = _dispatch_word()
+            word.Visible = False
         
         # Open document
         abs_path = str(Path(file_path).resolve())
@@ -584,26 +854,23 @@ def scan_for_smartart_and_canvas(file_path):
         for shape in doc.Shapes:
             shape_count += 1
             try:
-                # Get the page number where this shape is located
-                page_num = shape.Anchor.Information(3)  # wdActiveEndPageNumber = 3
+                # Check the cheap Type property first; every COM attribute
+                # access is a cross-process call, so the page lookup and
+                # crop probes only run for shapes that actually match.
                 shape_type = shape.Type
-                found_type = None
+                # 15 = msoSmartArt, 16 = msoCanvas (old constant),
+                # 20 = msoDiagram/msoGroup (Drawing Canvas in modern Word)
+                found_type = shape_type_map.get(shape_type)
                 
-                # Type 15 is msoSmartArt
-                if shape_type == 15:
-                    found_type = 'SmartArt'
-                # Type 16 is msoCanvas (old constant, rarely used)
-                # Type 20 is msoDiagram/msoGroup (Drawing Canvas in modern Word)
-                elif shape_type == 16 or shape_type == 20:
-                    found_type = 'Drawing Canvas'
                 # Type 13 is Picture - check if cropped
-                elif shape_type == 13:
+                if found_type is None and shape_type == 13:
                     try:
-                        if hasattr(shape.PictureFormat, 'CropLeft'):
-                            left = shape.PictureFormat.CropLeft
-                            top = shape.PictureFormat.CropTop
-                            right = shape.PictureFormat.CropRight
-                            bottom = shape.PictureFormat.CropBottom
+                        pf = shape.PictureFormat
+                        if hasattr(pf, 'CropLeft'):
+                            left = pf.CropLeft
+                            top = pf.CropTop
+                            right = pf.CropRight
+                            bottom = pf.CropBottom
                             
                             if left != 0 or top != 0 or right != 0 or bottom != 0:
                                 found_type = 'Cropped Image'
@@ -611,6 +878,7 @@ def scan_for_smartart_and_canvas(file_path):
                         pass
                 
                 if found_type:
+                    page_num = shape.Anchor.Information(3)  # wdActiveEndPageNumber = 3
                     objects_found.append({
                         'type': found_type,
                         'page': page_num
@@ -631,8 +899,8 @@ def scan_for_smartart_and_canvas(file_path):
         for inline_shape in doc.InlineShapes:
             inline_count += 1
             try:
-                # Get the page number
-                page_num = inline_shape.Range.Information(3)  # wdActiveEndPageNumber = 3
+                # Same ordering as above: classify by Type before paying
+                # for the page-number lookup.
                 shape_type = inline_shape.Type
                 found_type = None
                 
@@ -642,11 +910,12 @@ def scan_for_smartart_and_canvas(file_path):
                 # Type 3 is Picture - check if cropped
                 elif shape_type == 3:
                     try:
-                        if hasattr(inline_shape.PictureFormat, 'CropLeft'):
-                            left = inline_shape.PictureFormat.CropLeft
-                            top = inline_shape.PictureFormat.CropTop
-                            right = inline_shape.PictureFormat.CropRight
-                            bottom = inline_shape.PictureFormat.CropBottom
+                        pf = inline_shape.PictureFormat
+                        if hasattr(pf, 'CropLeft'):
+                            left = pf.CropLeft
+                            top = pf.CropTop
+                            right = pf.CropRight
+                            bottom = pf.CropBottom
                             
                             if left != 0 or top != 0 or right != 0 or bottom != 0:
                                 found_type = 'Cropped Image'
@@ -654,6 +923,7 @@ def scan_for_smartart_and_canvas(file_path):
                         pass
                 
                 if found_type:
+                    page_num = inline_shape.Range.Information(3)  # wdActiveEndPageNumber = 3
                     objects_found.append({
                         'type': found_type,
                         'page': page_num
@@ -707,12 +977,72 @@ def scan_for_smartart_and_canvas(file_path):
         # Clean up
         if doc:
             doc.Close(False)
-        if word:
+        if word and owns_word:
             word.Quit()
+        pythoncom.CoUninitialize()
     
     return objects_found
 
 
+def _image_fingerprint(data):
+    """
+    8-hex-char content fingerprint used for image filenames.
+    
+    Uses xxh3 when the xxhash package is installed (several times faster
+    on large blobs), otherwise blake2b. Note the two produce different
+    names, so a given images directory should be built with one setup.
+    """
+    if xxhash is not None:
+        return xxhash.xxh3_64(data).hexdigest()[:8]
+    return hashlib.blake2b(data, digest_size=4).hexdigest()
+
+
+def _export_image(related_parts, embed_id, images_dir, standard, subject_slug,
+                  cache):
+    """
+    Resolve an embedded image relationship to an exported file.
+    
+    The image is written under a content-hash filename on first sight (so
+    the same picture always lands at the same path) and the result is
+    cached per relationship ID, making repeated references to the same
+    part a dict lookup instead of a hash-and-stat.
+    
+    Returns:
+        Tuple of (image_id, image_url).
+    """
+    cached = cache.get(embed_id)
+    if cached is not None:
+        return cached
+    
+    # Get the image part from the relationship. The memoryview lets the
+    # hash and the file write consume the blob without copying it.
+    image_part = related_parts[embed_id]
+    image_bytes = memoryview(image_part.blob)
+    
+    # Determine image extension
+    ext = _CONTENT_TYPE_EXT.get(image_part.content_type, 'png')
+    
+    # Generate consistent ID based on image content hash
+    # This ensures the same image always gets the same ID
+    image_id = _image_fingerprint(image_bytes)
+    
+    # Use the ID as the filename
+    image_filename = f"{image_id}.{ext}"
+    image_path = images_dir / image_filename
+    
+    # Save image only if it doesn't already exist
+    path_key = str(image_path)
+    if path_key not in _images_on_disk:
+        if not image_path.exists():
+            with open(image_path, 'wb') as img_file:
+                img_file.write(image_bytes)
+        _images_on_disk.add(path_key)
+    
+    image_url = f"/db/{standard}-{subject_slug}/images/{image_filename}"
+    cache[embed_id] = (image_id, image_url)
+    return (image_id, image_url)
+
+
 def process_word_document(file_path, standard, subject):
     """
     Process a Word document and convert it to the specified JSON schema.
@@ -732,6 +1062,11 @@ def process_word_document(file_path, standard, subject):
     images_dir = Path(f"../../db/{standard}-{subject_slug}/images")
     images_dir.mkdir(parents=True, exist_ok=True)
     
+    # Relationship -> exported image, per document, and the package's
+    # relationship map bound once instead of per image
+    image_cache = {}
+    related_parts = doc.part.related_parts
+    
     # Initialize the result structure
     result = {
         "topics": []
@@ -744,43 +1079,53 @@ def process_word_document(file_path, standard, subject):
     processing_started = False
     processing_stopped = False
     
-    # Process all paragraphs
-    for paragraph in doc.paragraphs:
-        style = get_paragraph_style(paragraph)
-        text = paragraph.text.strip()
-        
-
-        
-        # Check for start marker: <teach> with style "# Meta Data"
-        if style == "# Meta Data" and text.lower() == "<teach>":
-            processing_started = True
-            continue  # Skip the marker itself
-        
-        # Check for stop markers: <revision> or <question> with style "# Meta Data"
-        if style == "# Meta Data" and (text.lower() == "<revision>" or text.lower() == "<question>"):
-            processing_stopped = True
-            break  # Stop processing
-        
-        # Skip processing if we haven't started yet or if we've stopped
-        if not processing_started or processing_stopped:
+    # Process all paragraphs. Iterating the body children directly and
+    # wrapping each w:p on demand avoids materializing the full
+    # doc.paragraphs list up front for large chapters.
+    style_map = _build_style_map(doc)
+    body = doc.element.body
+    for p_elem in body.iterchildren(W_P):
+        style = _style_name(p_elem, style_map)
+        
+        # Fast path for the prelude: nothing before the <teach> marker is
+        # exported, so until it appears only marker paragraphs need their
+        # text extracted at all.
+        if not processing_started:
+            if style == "# Meta Data":
+                marker = _element_text(p_elem).strip().lower()
+                if marker == "<teach>":
+                    processing_started = True
+                elif marker == "<revision>" or marker == "<question>":
+                    processing_stopped = True
+                    break
             continue
         
+        # Check for stop markers: <revision> or <question> with style
+        # "# Meta Data". Text extraction happens only in the branches that
+        # consume it (markers and topic titles).
+        if style == "# Meta Data":
+            marker = _element_text(p_elem).strip().lower()
+            if marker == "<revision>" or marker == "<question>":
+                processing_stopped = True
+                break  # Stop processing
+        
         # Process based on style
         if style == "# Sub Topic - 1":
             # Create a new topic
             current_topic = {
                 "id": generate_id(),
-                "title": text,
+                "title": _element_text(p_elem).strip(),
                 "subTopics": []
             }
             result["topics"].append(current_topic)
             current_subtopic = None  # Reset subtopic when new topic starts
             
         elif style == "# Sub Topic - 2":
-            # Create a new subtopic
+            # Create a new subtopic ("content" always starts as a list, so
+            # downstream appends don't need existence guards)
             current_subtopic = {
                 "id": generate_id(),
-                "title": text,
+                "title": _element_text(p_elem).strip(),
                 "content": []
             }
             
@@ -796,152 +1141,30 @@ def process_word_document(file_path, standard, subject):
                 }
                 result["topics"].append(current_topic)
                 
-        elif style == "# Bullet-1":
-            # Extract content (text and equations) in document order
-            content_list = extract_paragraph_content_in_order(paragraph)
-            
-            if current_subtopic is not None and content_list:
-                if "content" not in current_subtopic:
-                    current_subtopic["content"] = []
-                
-                # Use paragraph wrapper for mixed content
-                content_item = create_paragraph_wrapper(content_list, "bullet1")
-                if content_item:
-                    current_subtopic["content"].append(content_item)
-                
-        elif style == "# Body":
-            # Extract content (text and equations) in document order
-            content_list = extract_paragraph_content_in_order(paragraph)
-            
-            if current_subtopic is not None and content_list:
-                if "content" not in current_subtopic:
-                    current_subtopic["content"] = []
-                
-                # Use paragraph wrapper for mixed content
-                content_item = create_paragraph_wrapper(content_list, "body")
-                if content_item:
-                    current_subtopic["content"].append(content_item)
-                
-        elif style == "# Bullet-2":
-            # Extract content (text and equations) in document order
-            content_list = extract_paragraph_content_in_order(paragraph)
-            
-            if current_subtopic is not None and content_list:
-                if "content" not in current_subtopic:
-                    current_subtopic["content"] = []
-                
-                # Use paragraph wrapper for mixed content
-                content_item = create_paragraph_wrapper(content_list, "bullet2")
-                if content_item:
-                    current_subtopic["content"].append(content_item)
-        
-        elif style == "# Sub Topic - 3":
-            # Extract content (text and equations) in document order
-            content_list = extract_paragraph_content_in_order(paragraph)
-            
-            if current_subtopic is not None and content_list:
-                if "content" not in current_subtopic:
-                    current_subtopic["content"] = []
-                
-                # Use paragraph wrapper for mixed content
-                content_item = create_paragraph_wrapper(content_list, "sub-topic-3")
-                if content_item:
-                    current_subtopic["content"].append(content_item)
-        
-        elif style == "# Numbering-1":
-            # Extract content (text and equations) in document order
-            content_list = extract_paragraph_content_in_order(paragraph)
-            numbering = extract_numbering_text(paragraph)
-            
-            if current_subtopic is not None and content_list:
-                if "content" not in current_subtopic:
-                    current_subtopic["content"] = []
-                
-                # Use paragraph wrapper for mixed content
-                content_item = create_paragraph_wrapper(content_list, "number1", numbering)
-                if content_item:
-                    current_subtopic["content"].append(content_item)
-        
-        elif style == "# Numbering-2":
-            # Extract content (text and equations) in document order
-            content_list = extract_paragraph_content_in_order(paragraph)
-            numbering = extract_numbering_text(paragraph)
-            
-            if current_subtopic is not None and content_list:
-                if "content" not in current_subtopic:
-                    current_subtopic["content"] = []
-                
-                # Use paragraph wrapper for mixed content
-                content_item = create_paragraph_wrapper(content_list, "number2", numbering)
-                if content_item:
-                    current_subtopic["content"].append(content_item)
-        
-        elif style == "# Highlight Red":
-            # Extract content (text and equations) in document order
-            content_list = extract_paragraph_content_in_order(paragraph)
-            
-            if current_subtopic is not None and content_list:
-                if "content" not in current_subtopic:
-                    current_subtopic["content"] = []
-                
-                # Use paragraph wrapper for mixed content
-                content_item = create_paragraph_wrapper(content_list, "highlight-red")
-                if content_item:
-                    current_subtopic["content"].append(content_item)
-        
-        elif style == "# Highlight Brown":
+        elif style in _STYLE_TO_WRAPPER:
             # Extract content (text and equations) in document order
-            content_list = extract_paragraph_content_in_order(paragraph)
+            content_list = extract_paragraph_content_in_order(p_elem)
+            numbering = (extract_numbering_text(p_elem)
+                         if style in _NUMBERED_STYLES else None)
             
             if current_subtopic is not None and content_list:
-                if "content" not in current_subtopic:
-                    current_subtopic["content"] = []
-                
                 # Use paragraph wrapper for mixed content
-                content_item = create_paragraph_wrapper(content_list, "highlight-brown")
+                content_item = create_paragraph_wrapper(
+                    content_list, _STYLE_TO_WRAPPER[style], numbering)
                 if content_item:
                     current_subtopic["content"].append(content_item)
         
-        elif style == "# Highlight Blue":
+        # For all remaining styles only equations (plus text for the styles
+        # in _TEXT_ENABLED_STYLES) are exported, and most such paragraphs
+        # are plain prose — skip the deep extraction unless the style
+        # qualifies or the paragraph actually contains math
+        elif current_subtopic is not None and (
+                style in _TEXT_ENABLED_STYLES or _XP_HAS_MATH(p_elem)):
             # Extract content (text and equations) in document order
-            content_list = extract_paragraph_content_in_order(paragraph)
-            
-            if current_subtopic is not None and content_list:
-                if "content" not in current_subtopic:
-                    current_subtopic["content"] = []
-                
-                # Use paragraph wrapper for mixed content
-                content_item = create_paragraph_wrapper(content_list, "highlight-blue")
-                if content_item:
-                    current_subtopic["content"].append(content_item)
-        
-        elif style == "# Highlight Green":
-            # Extract content (text and equations) in document order
-            content_list = extract_paragraph_content_in_order(paragraph)
-            
-            if current_subtopic is not None and content_list:
-                if "content" not in current_subtopic:
-                    current_subtopic["content"] = []
-                
-                # Use paragraph wrapper for mixed content
-                content_item = create_paragraph_wrapper(content_list, "highlight-green")
-                if content_item:
-                    current_subtopic["content"].append(content_item)
-        
-        # For all other paragraph styles, check if they contain equations
-        # This handles styles like "# Body Equation", "# Headline", "# Highlight", etc.
-        else:
-            # Extract content (text and equations) in document order
-            content_list = extract_paragraph_content_in_order(paragraph)
+            content_list = extract_paragraph_content_in_order(p_elem)
             
             # Add each content item in order
-            if current_subtopic is not None and content_list:
-                if "content" not in current_subtopic:
-                    current_subtopic["content"] = []
-                
-                # List of styles where we want to extract both text and equations
-                text_enabled_styles = ["# Highlight", "# Headline", "# Body Equation"]
-                
+            if content_list:
                 for content_type, content_value in content_list:
                     if content_type == 'equation':
                         equation_item = {
@@ -950,7 +1173,7 @@ def process_word_document(file_path, standard, subject):
                             "equation": content_value
                         }
                         current_subtopic["content"].append(equation_item)
-                    elif content_type == 'text' and style in text_enabled_styles:
+                    elif content_type == 'text' and style in _TEXT_ENABLED_STYLES:
                         # Extract text from known styles that may contain inline equations
                         text_item = {
                             "id": generate_id(),
@@ -959,78 +1182,38 @@ def process_word_document(file_path, standard, subject):
                         }
                         current_subtopic["content"].append(text_item)
         
-        # Check for images in paragraph runs
-        for run in paragraph.runs:
-            # Look for drawing elements in the run's XML
-            drawing_elements = run.element.findall('.//{http://schemas.openxmlformats.org/wordprocessingml/2006/main}drawing', )
+        # Check for images anywhere in the paragraph; one query over the
+        # paragraph subtree covers every run at once
+        for embed_id in _XP_EMBED_IDS(p_elem):
+            try:
+                image_id, image_url = _export_image(
+                    related_parts, embed_id, images_dir, standard,
+                    subject_slug, image_cache)
             
-            for drawing in drawing_elements:
-                # Find blip elements which contain image references
-                blips = drawing.findall('.//{http://schemas.openxmlformats.org/drawingml/2006/main}blip')
-                
-                for blip in blips:
-                    # Get the relationship ID
-                    embed_id = blip.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed')
-                    
-                    if embed_id:
-                        try:
-                            # Get the image part from the relationship
-                            image_part = doc.part.related_parts[embed_id]
-                            image_bytes = image_part.blob
-                            
-                            # Determine image extension
-                            content_type = image_part.content_type
-                            ext = 'png'
-                            if 'jpeg' in content_type or 'jpg' in content_type:
-                                ext = 'jpg'
-                            elif 'png' in content_type:
-                                ext = 'png'
-                            elif 'gif' in content_type:
-                                ext = 'gif'
-                            
-                            # Generate consistent ID based on image content hash
-                            # This ensures the same image always gets the same ID
-                            image_hash = hashlib.md5(image_bytes).hexdigest()
-                            image_id = image_hash[:8]  # Use first 8 characters
-                            
-                            # Use the ID as the filename
-                            image_filename = f"{image_id}.{ext}"
-                            image_path = images_dir / image_filename
-                            
-                            # Save image only if it doesn't already exist
-                            if not image_path.exists():
-                                with open(image_path, 'wb') as img_file:
-                                    img_file.write(image_bytes)
-                            
-                            # Create image content item with relative URL
-                            image_url = f"/db/{standard}-{subject_slug}/images/{image_filename}"
-                            
-                            # Get alt text from current context
-                            if current_subtopic:
-                                alt_text = current_subtopic['title']
-                            elif current_topic:
-                                alt_text = current_topic['title']
-                            else:
-                                alt_text = "Image"
-                            
-                            content_item = {
-                                "id": image_id,
-                                "type": "image",
-                                "url": image_url,
-                                "metadata": {
-                                    "altText": alt_text,
-                                    "size": "medium"  # Default size
-                                }
-                            }
-                            
-                            # Add to current subtopic
-                            if current_subtopic is not None:
-                                if "content" not in current_subtopic:
-                                    current_subtopic["content"] = []
-                                current_subtopic["content"].append(content_item)
-                            
-                        except Exception as e:
-                            print(f"Warning: Could not extract image from embed_id {embed_id}: {e}")
+                # Get alt text from current context
+                if current_subtopic:
+                    alt_text = current_subtopic['title']
+                elif current_topic:
+                    alt_text = current_topic['title']
+                else:
+                    alt_text = "Image"
+            
+                content_item = {
+                    "id": image_id,
+                    "type": "image",
+                    "url": image_url,
+                    "metadata": {
+                        "altText": alt_text,
+                        "size": "medium"  # Default size
+                    }
+                }
+            
+                # Add to current subtopic
+                if current_subtopic is not None:
+                    current_subtopic["content"].append(content_item)
+            
+            except Exception as e:
+                print(f"Warning: Could not extract image from embed_id {embed_id}: {e}")
         
     
     return result
@@ -1059,6 +1242,11 @@ def process_word_document_qa(file_path, standard, subject):
     
     qa_list = []
     
+    # Relationship -> exported image, per document, and the package's
+    # relationship map bound once instead of per image
+    image_cache = {}
+    related_parts = doc.part.related_parts
+    
     # Processing state
     processing_started = False
     processing_stopped = False
@@ -1095,31 +1283,14 @@ def process_word_document_qa(file_path, standard, subject):
         current_reference = None
         current_mcq_answer = None
     
-    def extract_custom_xml_tags(paragraph):
-        """Extract custom XML tags from paragraph."""
-        tags = {}
-        try:
-            # Look for custom XML properties in the paragraph
-            para_xml = paragraph._element
-            w_ns = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
-            
-            # Check for custom XML tags in the paragraph properties
-            for child in para_xml:
-                tag_name = child.tag.replace(w_ns, '')
-                if hasattr(child, 'get'):
-                    # Extract attributes
-                    for attr_key, attr_val in child.attrib.items():
-                        clean_key = attr_key.replace(w_ns, '')
-                        tags[clean_key] = attr_val
-        except Exception as e:
-            pass
-        
-        return tags
-    
-    # Process all paragraphs
-    for paragraph in doc.paragraphs:
-        style = get_paragraph_style(paragraph)
-        text = paragraph.text.strip()
+    # Process all paragraphs, walking the body's w:p children directly
+    # (same lazy iteration as the concepts exporter)
+    style_map = _build_style_map(doc)
+    for p_elem in doc.element.body.iterchildren(W_P):
+        style = _style_name(p_elem, style_map)
+        # Paragraph text is only consulted for Meta Data markers and tags;
+        # content paragraphs go through the extractors instead
+        text = _element_text(p_elem).strip() if style == "# Meta Data" else ''
         
         # Check for start marker: <question> with style "# Meta Data"
         if style == "# Meta Data" and text.lower() == "<question>":
@@ -1163,7 +1334,7 @@ def process_word_document_qa(file_path, standard, subject):
                 current_exercise_type = "board"
             
             # Check for question type tags
-            type_match = re.match(r'<type=(\d+)>', text.lower())
+            type_match = _TYPE_TAG_RE.match(text.lower())
             if type_match:
                 type_num = type_match.group(1)
                 if type_num == "1":
@@ -1176,12 +1347,12 @@ def process_word_document_qa(file_path, standard, subject):
                     current_question_type = "very-long"
             
             # Check for exercise reference
-            exercise_match = re.match(r'<exercise="([^"]+)">', text.lower())
+            exercise_match = _EXERCISE_TAG_RE.match(text.lower())
             if exercise_match:
                 current_reference = exercise_match.group(1)
             
             # Check for MCQ answer
-            activity_match = re.match(r'<activity_quiz="[^"]+",\s*answer="?(\d+)"?>', text.lower())
+            activity_match = _ACTIVITY_QUIZ_RE.match(text.lower())
             if activity_match:
                 current_mcq_answer = int(activity_match.group(1))
             
@@ -1201,62 +1372,18 @@ def process_word_document_qa(file_path, standard, subject):
         if in_question or in_answer:
             content_item = None
             
-            # Process based on style
-            if style == "# Body":
-                content_list = extract_paragraph_content_in_order(paragraph)
+            # Process based on style (same table as the concepts exporter)
+            if style in _STYLE_TO_WRAPPER:
+                content_list = extract_paragraph_content_in_order(p_elem)
+                numbering = (extract_numbering_text(p_elem)
+                             if style in _NUMBERED_STYLES else None)
                 if content_list:
-                    content_item = create_paragraph_wrapper(content_list, "body")
-            
-            elif style == "# Bullet-1":
-                content_list = extract_paragraph_content_in_order(paragraph)
-                if content_list:
-                    content_item = create_paragraph_wrapper(content_list, "bullet1")
-            
-            elif style == "# Bullet-2":
-                content_list = extract_paragraph_content_in_order(paragraph)
-                if content_list:
-                    content_item = create_paragraph_wrapper(content_list, "bullet2")
-            
-            elif style == "# Numbering-1":
-                content_list = extract_paragraph_content_in_order(paragraph)
-                numbering = extract_numbering_text(paragraph)
-                if content_list:
-                    content_item = create_paragraph_wrapper(content_list, "number1", numbering)
-            
-            elif style == "# Numbering-2":
-                content_list = extract_paragraph_content_in_order(paragraph)
-                numbering = extract_numbering_text(paragraph)
-                if content_list:
-                    content_item = create_paragraph_wrapper(content_list, "number2", numbering)
-            
-            elif style == "# Highlight Red":
-                content_list = extract_paragraph_content_in_order(paragraph)
-                if content_list:
-                    content_item = create_paragraph_wrapper(content_list, "highlight-red")
-            
-            elif style == "# Highlight Brown":
-                content_list = extract_paragraph_content_in_order(paragraph)
-                if content_list:
-                    content_item = create_paragraph_wrapper(content_list, "highlight-brown")
-            
-            elif style == "# Highlight Blue":
-                content_list = extract_paragraph_content_in_order(paragraph)
-                if content_list:
-                    content_item = create_paragraph_wrapper(content_list, "highlight-blue")
-            
-            elif style == "# Highlight Green":
-                content_list = extract_paragraph_content_in_order(paragraph)
-                if content_list:
-                    content_item = create_paragraph_wrapper(content_list, "highlight-green")
-            
-            elif style == "# Sub Topic - 3":
-                content_list = extract_paragraph_content_in_order(paragraph)
-                if content_list:
-                    content_item = create_paragraph_wrapper(content_list, "sub-topic-3")
+                    content_item = create_paragraph_wrapper(
+                        content_list, _STYLE_TO_WRAPPER[style], numbering)
             
             else:
                 # For other styles, check for equations
-                content_list = extract_paragraph_content_in_order(paragraph)
+                content_list = extract_paragraph_content_in_order(p_elem)
                 if content_list:
                     for content_type, content_value in content_list:
                         if content_type == 'equation':
@@ -1277,66 +1404,32 @@ def process_word_document_qa(file_path, standard, subject):
                 else:
                     current_answer_content.append(content_item)
             
-            # Check for images in paragraph runs
-            for run in paragraph.runs:
-                drawing_elements = run.element.findall('.//{http://schemas.openxmlformats.org/wordprocessingml/2006/main}drawing')
+            # Check for images anywhere in the paragraph; one query over
+            # the paragraph subtree covers every run at once
+            for embed_id in _XP_EMBED_IDS(p_elem):
+                try:
+                    image_id, image_url = _export_image(
+                        related_parts, embed_id, images_dir, standard,
+                        subject_slug, image_cache)
                 
-                for drawing in drawing_elements:
-                    blips = drawing.findall('.//{http://schemas.openxmlformats.org/drawingml/2006/main}blip')
-                    
-                    for blip in blips:
-                        embed_id = blip.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed')
-                        
-                        if embed_id:
-                            try:
-                                # Get the image part from the relationship
-                                image_part = doc.part.related_parts[embed_id]
-                                image_bytes = image_part.blob
-                                
-                                # Determine image extension
-                                content_type = image_part.content_type
-                                ext = 'png'
-                                if 'jpeg' in content_type or 'jpg' in content_type:
-                                    ext = 'jpg'
-                                elif 'png' in content_type:
-                                    ext = 'png'
-                                elif 'gif' in content_type:
-                                    ext = 'gif'
-                                
-                                # Generate consistent ID based on image content hash
-                                image_hash = hashlib.md5(image_bytes).hexdigest()
-                                image_id = image_hash[:8]
-                                
-                                # Use the ID as the filename
-                                image_filename = f"{image_id}.{ext}"
-                                image_path = images_dir / image_filename
-                                
-                                # Save image only if it doesn't already exist
-                                if not image_path.exists():
-                                    with open(image_path, 'wb') as img_file:
-                                        img_file.write(image_bytes)
-                                
-                                # Create image content item with relative URL
-                                image_url = f"/db/{standard}-{subject_slug}/images/{image_filename}"
-                                
-                                image_content_item = {
-                                    "id": image_id,
-                                    "type": "image",
-                                    "url": image_url,
-                                    "metadata": {
-                                        "altText": "Question Image" if in_question else "Answer Image",
-                                        "size": "medium"
-                                    }
-                                }
-                                
-                                # Add to appropriate list
-                                if in_question:
-                                    current_question_content.append(image_content_item)
-                                else:
-                                    current_answer_content.append(image_content_item)
-                                
-                            except Exception as e:
-                                print(f"Warning: Could not extract image from embed_id {embed_id}: {e}")
+                    image_content_item = {
+                        "id": image_id,
+                        "type": "image",
+                        "url": image_url,
+                        "metadata": {
+                            "altText": "Question Image" if in_question else "Answer Image",
+                            "size": "medium"
+                        }
+                    }
+                
+                    # Add to appropriate list
+                    if in_question:
+                        current_question_content.append(image_content_item)
+                    else:
+                        current_answer_content.append(image_content_item)
+                
+                except Exception as e:
+                    print(f"Warning: Could not extract image from embed_id {embed_id}: {e}")
     
     # Finalize last Q&A if exists
     if in_question or in_answer:
@@ -1345,6 +1438,48 @@ def process_word_document_qa(file_path, standard, subject):
     return qa_list
 
 
+def _load_json(path):
+    """Parse a JSON file, using orjson when it is installed."""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _load_db(db_path):
+    """Read a JSON database file, or return a fresh structure if absent."""
+    if db_path.exists():
+        return _load_json(db_path)
+    return {"chapters": []}
+
+
+def _write_json(path, data):
+    """
+    Write JSON data to a file atomically.
+    Dumps to a temp file next to the target, then swaps it in with os.replace
+    so an interrupted run can never leave a truncated/corrupt database file.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    if orjson is not None:
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+# Image files confirmed on disk during this run, by path string. Distinct
+# relationships that carry the same picture map to the same content-hash
+# filename, so this also skips their stat-and-write entirely.
+_images_on_disk = set()
+
+# (standard, subject) pairs already resolved in this process
+_subject_id_cache = {}
+
+
 def get_subject_id(standard, subject):
     """
     Fetch the subject ID from subjects.json based on standard and subject name.
@@ -1357,6 +1492,11 @@ def get_subject_id(standard, subject):
     Returns:
         The subject ID (creates new entry if not found)
     """
+    cache_key = (standard, subject.lower())
+    cached = _subject_id_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     subjects_path = Path("../../db/subjects.json")
     
     if not subjects_path.exists():
@@ -1364,29 +1504,24 @@ def get_subject_id(standard, subject):
         return ""
     
     try:
-        with open(subjects_path, 'r', encoding='utf-8') as f:
-            subjects_data = json.load(f)
+        subjects_data = _load_json(subjects_path)
         
         # Normalize subject name for comparison (capitalize first letter)
         subject_normalized = subject.capitalize()
         
         # Find TNSB publisher (or create if doesn't exist)
-        tnsb_publisher = None
-        for publisher in subjects_data.get('publishers', []):
-            if publisher.get('publisherName') == 'TNSB':
-                tnsb_publisher = publisher
-                break
+        tnsb_publisher = next(
+            (p for p in subjects_data.get('publishers', [])
+             if p.get('publisherName') == 'TNSB'), None)
         
         if not tnsb_publisher:
             print("Warning: TNSB publisher not found in subjects.json")
             return ""
         
-        # Search for the standard
-        standard_obj = None
-        for std in tnsb_publisher.get('standards', []):
-            if std.get('standardName') == standard:
-                standard_obj = std
-                break
+        # Index the standards by name and look the requested one up
+        standards_by_name = {std.get('standardName'): std
+                             for std in tnsb_publisher.get('standards', [])}
+        standard_obj = standards_by_name.get(standard)
         
         # If standard not found, create it
         if not standard_obj:
@@ -1400,10 +1535,14 @@ def get_subject_id(standard, subject):
             # Sort standards by standardName
             tnsb_publisher['standards'].sort(key=lambda x: int(x.get('standardName', '0')))
         
-        # Search for the subject within the standard
-        for subj in standard_obj.get('subjects', []):
-            if subj.get('subjectName', '').lower() == subject_normalized.lower():
-                return subj.get('id', '')
+        # Index the subjects by lowercased name and look the subject up
+        subjects_by_name = {subj.get('subjectName', '').lower(): subj
+                            for subj in standard_obj.get('subjects', [])}
+        existing_subject = subjects_by_name.get(subject_normalized.lower())
+        if existing_subject is not None:
+            subject_id = existing_subject.get('id', '')
+            _subject_id_cache[cache_key] = subject_id
+            return subject_id
         
         # If subject not found, create it
         print(f"Subject '{subject}' not found for standard '{standard}'. Creating new subject entry.")
@@ -1413,12 +1552,12 @@ def get_subject_id(standard, subject):
             "subjectName": subject_normalized
         }
         standard_obj['subjects'].append(new_subject)
-        
+
         # Write updated data back to subjects.json
-        with open(subjects_path, 'w', encoding='utf-8') as f:
-            json.dump(subjects_data, f, indent=2, ensure_ascii=False)
-        
+        _write_json(subjects_path, subjects_data)
+
         print(f"✓ Added subject '{subject_normalized}' to standard '{standard}' with ID: {new_subject_id}")
+        _subject_id_cache[cache_key] = new_subject_id
         return new_subject_id
         
     except Exception as e:
@@ -1426,7 +1565,25 @@ def get_subject_id(standard, subject):
         return ""
 
 
-def process_single_file(input_file, standard, subject, subject_id, db_path):
+def _parse_concepts_file(args):
+    """
+    Worker for the parallel parse phase of the concepts exporter.
+    
+    Args:
+        args: Tuple of (file_path, standard, subject).
+    
+    Returns:
+        Tuple of (topics, error_message); exactly one of the two is None.
+    """
+    file_path, standard, subject = args
+    try:
+        return process_word_document(file_path, standard, subject)['topics'], None
+    except Exception as e:
+        return None, str(e)
+
+
+def process_single_file(input_file, standard, subject, subject_id, db_path,
+                        db_data=None, chapter_index=None, topics=None):
     """
     Process a single Word document and update the database.
     
@@ -1436,6 +1593,13 @@ def process_single_file(input_file, standard, subject, subject_id, db_path):
         subject: The subject name
         subject_id: The subject ID from subjects.json
         db_path: Path to the concept.json database file
+        db_data: Optional in-memory database dict. When given, the chapter
+            is merged into it and the caller owns sorting and writing the
+            file once at the end of the run.
+        chapter_index: Optional chapterNo -> chapter dict mapping into
+            db_data, kept up to date as chapters are added.
+        topics: Optional pre-parsed topics list (from a worker process);
+            when given the document is not parsed again here.
     """
     # Extract chapter number from filename (without extension)
     input_path = Path(input_file)
@@ -1447,31 +1611,28 @@ def process_single_file(input_file, standard, subject, subject_id, db_path):
         return False
     
     try:
-        # Process the document to get topics
-        result = process_word_document(input_file, standard, subject)
-        topics = result['topics']
-        
-        # Read the existing database or create a new one
-        if db_path.exists():
-            with open(db_path, 'r', encoding='utf-8') as f:
-                db_data = json.load(f)
-        else:
-            # Create a new database structure
-            db_data = {
-                "chapters": []
-            }
+        # Process the document to get topics (skipped when the caller
+        # already parsed the file in a worker process)
+        if topics is None:
+            result = process_word_document(input_file, standard, subject)
+            topics = result['topics']
+        
+        # Batched mode: the caller loaded the database once and writes it
+        # once after every file has been merged
+        batched = db_data is not None
+        if not batched:
+            db_data = _load_db(db_path)
+        if chapter_index is None:
+            chapter_index = {c.get('chapterNo'): c
+                             for c in db_data.get('chapters', [])}
         
         # Find the chapter in the database
-        chapter_found = False
-        for chapter in db_data.get('chapters', []):
-            if chapter.get('chapterNo') == chapter_no:
-                # Update the topics for this chapter
-                chapter['topics'] = topics
-                chapter_found = True
-                # print(f"✓ Updated Chapter {chapter_no}: {input_path.name}")
-                break
-        
-        if not chapter_found:
+        chapter = chapter_index.get(chapter_no)
+        if chapter is not None:
+            # Update the topics for this chapter
+            chapter['topics'] = topics
+            # print(f"✓ Updated Chapter {chapter_no}: {input_path.name}")
+        else:
             # Create a new chapter entry
             new_chapter = {
                 "id": generate_id(),
@@ -1481,14 +1642,17 @@ def process_single_file(input_file, standard, subject, subject_id, db_path):
                 "topics": topics
             }
             db_data['chapters'].append(new_chapter)
+            chapter_index[chapter_no] = new_chapter
             print(f"✓ Added Chapter {chapter_no}: {input_path.name}")
         
-        # Sort chapters by chapterNo to maintain numerical order
-        db_data['chapters'].sort(key=lambda x: x.get('chapterNo', 0))
-        
-        # Write the updated database back to file
-        with open(db_path, 'w', encoding='utf-8') as f:
-            json.dump(db_data, f, indent=2, ensure_ascii=False)
+        if not batched:
+            # Sort chapters by chapterNo to maintain numerical order
+            # (updating an existing chapter can't disturb the order)
+            if chapter is None:
+                db_data['chapters'].sort(key=_CHAPTER_NO_KEY)
+            
+            # Write the updated database back to file
+            _write_json(db_path, db_data)
         
         return True
         
@@ -1499,7 +1663,8 @@ def process_single_file(input_file, standard, subject, subject_id, db_path):
 
 
 
-def process_single_file_qa(input_file, standard, subject, subject_id, db_path):
+def process_single_file_qa(input_file, standard, subject, subject_id, db_path,
+                           db_data=None, chapter_index=None):
     """
     Process a single Word document and update the Q&A database.
     
@@ -1509,6 +1674,11 @@ def process_single_file_qa(input_file, standard, subject, subject_id, db_path):
         subject: The subject name
         subject_id: The subject ID from subjects.json
         db_path: Path to the qa.json database file
+        db_data: Optional in-memory database dict, as in
+            process_single_file: the caller sorts and writes once at the
+            end of the batch.
+        chapter_index: Optional chapterNo -> chapter mapping into db_data
+            (keys are strings, as stored in qa.json).
     """
     # Extract chapter number from filename (without extension)
     input_path = Path(input_file)
@@ -1523,26 +1693,21 @@ def process_single_file_qa(input_file, standard, subject, subject_id, db_path):
         # Process the document to get Q&A
         qa_list = process_word_document_qa(input_file, standard, subject)
         
-        # Read the existing database or create a new one
-        if db_path.exists():
-            with open(db_path, 'r', encoding='utf-8') as f:
-                db_data = json.load(f)
+        # Batched mode mirrors the concepts exporter: the caller loaded
+        # the database once and writes it once after the batch
+        batched = db_data is not None
+        if not batched:
+            db_data = _load_db(db_path)
+        if chapter_index is None:
+            chapter_index = {c.get('chapterNo'): c
+                             for c in db_data.get('chapters', [])}
+        
+        # Find the chapter in the database (chapterNo is string in qa.json)
+        chapter = chapter_index.get(str(chapter_no))
+        if chapter is not None:
+            # Update the Q&A for this chapter
+            chapter['qa'] = qa_list
         else:
-            # Create a new database structure
-            db_data = {
-                "chapters": []
-            }
-        
-        # Find the chapter in the database
-        chapter_found = False
-        for chapter in db_data.get('chapters', []):
-            if chapter.get('chapterNo') == str(chapter_no):  # chapterNo is string in qa.json
-                # Update the Q&A for this chapter
-                chapter['qa'] = qa_list
-                chapter_found = True
-                break
-        
-        if not chapter_found:
             # Create a new chapter entry
             new_chapter = {
                 "id": generate_id(),
@@ -1552,24 +1717,66 @@ def process_single_file_qa(input_file, standard, subject, subject_id, db_path):
                 "qa": qa_list
             }
             db_data['chapters'].append(new_chapter)
+            chapter_index[str(chapter_no)] = new_chapter
             print(f"✓ Added Chapter {chapter_no} Q&A: {input_path.name}")
         
-        # Sort chapters by chapterNo (convert to int for sorting)
-        db_data['chapters'].sort(key=lambda x: int(x.get('chapterNo', '0')))
-        
-        # Write the updated database back to file
-        with open(db_path, 'w', encoding='utf-8') as f:
-            json.dump(db_data, f, indent=2, ensure_ascii=False)
+        if not batched:
+            if chapter is None:
+                # Sort chapters by chapterNo (stored as a string in
+                # qa.json, so convert for ordering); updates keep the
+                # existing order
+                db_data['chapters'].sort(key=_qa_chapter_no_key)
+            
+            # Write the updated database back to file
+            _write_json(db_path, db_data)
         
         return True
         
     except Exception as e:
         print(f"✗ Error processing Q&A from '{input_path.name}': {str(e)}")
-        import traceback
         traceback.print_exc()
         return False
 
 
+def _list_docx_files(dir_path):
+    """
+    List the .docx files in a directory, sorted by name, skipping Word's
+    ~$ lock files. One os.scandir pass gives the names and the file/dir
+    distinction without extra stat calls.
+    """
+    files = []
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if (entry.name.endswith('.docx')
+                    and not entry.name.startswith('~$')
+                    and entry.is_file()):
+                files.append(Path(entry.path))
+    files.sort()
+    return files
+
+
+def _scan_file_batch(files):
+    """
+    Scan a batch of documents reusing one Word instance.
+    
+    Starting Word.Application is by far the most expensive part of a scan,
+    so each worker thread pays it once for its whole slice of files.
+    """
+    if not files:
+        return []
+    import pythoncom
+    pythoncom.CoInitialize()
+    word = None
+    try:
+        word = _dispatch_word()
+        word.Visible = False
+        return [scan_for_smartart_and_canvas(f, word=word) for f in files]
+    finally:
+        if word:
+            word.Quit()
+        pythoncom.CoUninitialize()
+
+
 def run_objects_scanner():
     """Run the Objects Scanner tool to detect SmartArt, Drawing Canvas, Tables, and Cropped Images."""
     print("\n" + "=" * 60)
@@ -1590,8 +1797,7 @@ def run_objects_scanner():
         return
     
     # Find all .docx files in the directory (exclude temporary files starting with ~$)
-    all_docx_files = dir_path.glob("*.docx")
-    docx_files = sorted([f for f in all_docx_files if not f.name.startswith("~$")])
+    docx_files = _list_docx_files(dir_path)
     
     if not docx_files:
         print(f"Error: No .docx files found in '{dir_path}'")
@@ -1603,16 +1809,29 @@ def run_objects_scanner():
     
     files_with_issues = []
     
-    # Scan each file
-    for docx_file in docx_files:
-        print(f"  Scanning '{docx_file.name}'...")
-        objects = scan_for_smartart_and_canvas(docx_file)
-        
+    # Scan phase. Scans spend most of their time blocked on
+    # out-of-process COM calls (which release the GIL), so a small thread
+    # pool overlaps the waiting; each worker reuses one Word instance for
+    # its whole stride of files.
+    max_workers = min(4, len(docx_files))
+    if max_workers > 1 and WIN32COM_AVAILABLE:
+        batches = [docx_files[i::max_workers] for i in range(max_workers)]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            batch_results = list(executor.map(_scan_file_batch, batches))
+        # Undo the striding so results line up with docx_files
+        results = [None] * len(docx_files)
+        for i, batch in enumerate(batch_results):
+            for j, objects in enumerate(batch):
+                results[i + j * max_workers] = objects
+    else:
+        results = [scan_for_smartart_and_canvas(f) for f in docx_files]
+    
+    for docx_file, objects in zip(docx_files, results):
         if objects:
-            print(f"    ⚠ Found {len(objects)} issue(s). Comments added.")
+            print(f"  '{docx_file.name}': ⚠ Found {len(objects)} issue(s). Comments added.")
             files_with_issues.append(docx_file)
         else:
-            print("    ✓ No issues found.")
+            print(f"  '{docx_file.name}': ✓ No issues found.")
 
     print()
     print(f"Scan complete. Found issues in {len(files_with_issues)} file(s).")
@@ -1627,7 +1846,7 @@ def run_objects_scanner():
         print()
         
         try:
-            word = win32com.client.Dispatch("Word.Application")
+            word = _dispatch_word()
             word.Visible = True
             
             for i, file_path in enumerate(files_with_issues):
@@ -1694,8 +1913,7 @@ def run_concepts_exporter():
         return
     
     # Find all .docx files in the directory (exclude temporary files starting with ~$)
-    all_docx_files = dir_path.glob("*.docx")
-    docx_files = sorted([f for f in all_docx_files if not f.name.startswith("~$")])
+    docx_files = _list_docx_files(dir_path)
     
     if not docx_files:
         print(f"Error: No .docx files found in '{dir_path}'")
@@ -1718,12 +1936,43 @@ def run_concepts_exporter():
     success_count = 0
     fail_count = 0
     
-    for docx_file in docx_files:
-        if process_single_file(docx_file, standard, subject, subject_id, db_path):
+    # Load the database once, merge every chapter in memory, write once
+    db_data = _load_db(db_path)
+    chapter_index = {c.get('chapterNo'): c
+                     for c in db_data.get('chapters', [])}
+    chapter_count = len(db_data['chapters'])
+    
+    # Parse phase: chapters are independent, so spread the docx parsing
+    # across worker processes. Merging below stays serial, in file order.
+    if len(docx_files) > 1:
+        with ProcessPoolExecutor() as executor:
+            parsed = list(executor.map(
+                _parse_concepts_file,
+                [(str(f), standard, subject) for f in docx_files]))
+    else:
+        parsed = [None] * len(docx_files)
+    
+    for docx_file, pre_parsed in zip(docx_files, parsed):
+        topics = None
+        if pre_parsed is not None:
+            topics, error = pre_parsed
+            if topics is None:
+                print(f"✗ Error processing '{docx_file.name}': {error}")
+                fail_count += 1
+                continue
+        if process_single_file(docx_file, standard, subject, subject_id, db_path,
+                               db_data=db_data, chapter_index=chapter_index,
+                               topics=topics):
             success_count += 1
         else:
             fail_count += 1
     
+    # Sort chapters by chapterNo to maintain numerical order; in-place
+    # updates keep the existing order, so only re-sort after additions
+    if len(db_data['chapters']) != chapter_count:
+        db_data['chapters'].sort(key=_CHAPTER_NO_KEY)
+    _write_json(db_path, db_data)
+    
     # Summary
     # print("-" * 60)
     # print()
@@ -1766,8 +2015,7 @@ def run_qa_exporter():
         return
     
     # Find all .docx files in the directory (exclude temporary files starting with ~$)
-    all_docx_files = dir_path.glob("*.docx")
-    docx_files = sorted([f for f in all_docx_files if not f.name.startswith("~$")])
+    docx_files = _list_docx_files(dir_path)
     
     if not docx_files:
         print(f"Error: No .docx files found in '{dir_path}'")
@@ -1787,12 +2035,24 @@ def run_qa_exporter():
     success_count = 0
     fail_count = 0
     
+    # Load the database once, merge every chapter in memory, write once
+    db_data = _load_db(db_path)
+    chapter_index = {c.get('chapterNo'): c
+                     for c in db_data.get('chapters', [])}
+    chapter_count = len(db_data['chapters'])
+    
     for docx_file in docx_files:
-        if process_single_file_qa(docx_file, standard, subject, subject_id, db_path):
+        if process_single_file_qa(docx_file, standard, subject, subject_id,
+                                  db_path, db_data=db_data,
+                                  chapter_index=chapter_index):
             success_count += 1
         else:
             fail_count += 1
     
+    if len(db_data['chapters']) != chapter_count:
+        db_data['chapters'].sort(key=_qa_chapter_no_key)
+    _write_json(db_path, db_data)
+    
     # Summary
     print(f"Successfully processed Q&A: {success_count} file(s)")
 